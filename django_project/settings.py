@@ -129,5 +129,34 @@ REST_FRAMEWORK = {
     # Use Django's standard `django.contrib.auth` permissions,
     # or allow read-only access for unauthenticated users.
     'DEFAULT_PERMISSION_CLASSES': [],
-    'TEST_REQUEST_DEFAULT_FORMAT': 'json'
+    'TEST_REQUEST_DEFAULT_FORMAT': 'json',
+    'DEFAULT_THROTTLE_CLASSES': [
+        'rest_framework.throttling.AnonRateThrottle',
+        'rest_framework.throttling.UserRateThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': os.environ.get('EMENU_ANON_THROTTLE_RATE', '600/minute'),
+        'user': os.environ.get('EMENU_USER_THROTTLE_RATE', '1200/minute'),
+    },
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+# Throttling and request coalescing across workers need a cache shared by all of them (e.g. memcached), the default
+# local memory cache is separate in every worker process.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('EMENU_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('EMENU_CACHE_LOCATION', ''),
+    }
+}
+
+# Coalescing of identical concurrent reads in emenu viewsets, timeouts in seconds.
+
+EMENU_COALESCING = {
+    'LOCK_TIMEOUT': 5,
+    'RESULT_TTL': 1,
+    'POLL_INTERVAL': 0.05,
 }
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class EmenuConfig(AppConfig):
     name = 'emenu'
+
+    def ready(self):
+        from emenu import signals  # noqa: F401
@@ -0,0 +1,144 @@
+import threading
+import time
+import uuid
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+VERSION_KEY = 'emenu:coalesce:version'
+
+
+def coalesce_setting(name, default):
+    return getattr(settings, 'EMENU_COALESCING', {}).get(name, default)
+
+
+class SingleFlight:
+    """
+    Runs a function at most once at a time per key. Concurrent callers with the same key wait for the running call
+    and share its result (or exception) instead of computing it again.
+    """
+
+    class Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self.Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+def cache_single_flight(key, fn):
+    """
+    Shares the result of fn between workers: the worker which takes the cache lock computes it and publishes it under
+    the result key, others poll for it and fall back to computing it themselves when the lock holder fails or times out.
+    """
+    lock_timeout = coalesce_setting('LOCK_TIMEOUT', 5)
+    result_ttl = coalesce_setting('RESULT_TTL', 1)
+    poll_interval = coalesce_setting('POLL_INTERVAL', 0.05)
+    lock_key, result_key = f'{key}:lock', f'{key}:result'
+
+    result = cache.get(result_key)
+    if result is not None:
+        return result
+
+    token = uuid.uuid4().hex
+    if cache.add(lock_key, token, lock_timeout):
+        try:
+            result = fn()
+            cache.set(result_key, result, result_ttl)
+            return result
+        finally:
+            # The lock may have expired while fn was running and been taken by another worker.
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        result = cache.get(result_key)
+        if result is not None:
+            return result
+        if cache.get(lock_key) is None:
+            break
+
+    return cache.get(result_key) or fn()
+
+
+def invalidate_coalesced_reads():
+    # add() and incr() are atomic, writers which both find no version can't overwrite each other's bump.
+    cache.add(VERSION_KEY, 0, None)
+    cache.incr(VERSION_KEY)
+
+
+class CoalescedReadMixin:
+    """
+    Coalesces identical concurrent list and retrieve requests, so that one computation is shared by all waiters
+    in the process and, through the cache, across workers.
+    Only requests of the same user (or of anonymous users) with the same path, Accept and Accept-Language headers are
+    coalesced, because waiters get the response of the first request without running permission checks themselves.
+    Shared results are kept in the cache for RESULT_TTL seconds. Saving or deleting dishes and dish cards, writes made
+    through the viewsets and adjusting prices invalidate them, other writes (e.g. QuerySet.update(),
+    DishCard.dishes.add() outside of a transaction saving the card or raw SQL) may be served stale within that window.
+    """
+    single_flight = SingleFlight()
+
+    def _coalesce_key(self, request):
+        version = cache.get(VERSION_KEY, 0)
+        user = request.user.pk if request.user.is_authenticated else 'anonymous'
+        identity = '|'.join(map(str, (
+            user, request.META.get('HTTP_ACCEPT', ''), request.META.get('HTTP_ACCEPT_LANGUAGE', ''),
+            request.get_full_path())))
+        return f'emenu:coalesce:{version}:{self.basename}:{md5(identity.encode()).hexdigest()}'
+
+    def _coalesced_read(self, request, read, *args, **kwargs):
+        def compute():
+            response = read(request, *args, **kwargs)
+            return response.status_code, response.data
+
+        key = self._coalesce_key(request)
+        status_code, data = self.single_flight.do(key, lambda: cache_single_flight(key, compute))
+        return Response(data, status=status_code)
+
+    def list(self, request, *args, **kwargs):
+        return self._coalesced_read(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._coalesced_read(request, super().retrieve, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        # Nested dishes are added to the card after it is saved.
+        transaction.on_commit(invalidate_coalesced_reads)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        transaction.on_commit(invalidate_coalesced_reads)
@@ -1,5 +1,11 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import DataError, transaction
 from django.db.models import Model, CharField, TextField, DateTimeField, DecimalField, TimeField, BooleanField, \
-    ManyToManyField
+    ManyToManyField, QuerySet, F, Q, Value, Func
+from django.db.models.functions import Cast
+from django.utils import timezone
 
 
 class BaseModel(Model):
@@ -13,6 +19,51 @@ class BaseModel(Model):
         return self.name
 
 
+class DishQuerySet(QuerySet):
+    PRICE_PERCENT = 'percent'
+    PRICE_ABSOLUTE = 'absolute'
+
+    def _adjusted_price(self, mode, value):
+        price_field = self.model._meta.get_field('price')
+        if mode == self.PRICE_PERCENT:
+            adjusted = F('price') * Value((100 + value) / 100, output_field=DecimalField())
+        elif mode == self.PRICE_ABSOLUTE:
+            adjusted = F('price') + Value(value, output_field=DecimalField())
+        else:
+            raise ValueError(f'Unknown price adjustment mode: {mode}')
+
+        return Func(adjusted, Value(price_field.decimal_places), function='ROUND', output_field=DecimalField())
+
+    def adjust_prices(self, mode, value):
+        """
+        Adjusts prices of all dishes in the queryset with a single UPDATE and returns the number of updated rows.
+        The dishes stay locked from the range check until the end of the transaction.
+        Raises ValidationError when any adjusted price would fall outside of the price field range.
+        """
+        price_field = self.model._meta.get_field('price')
+        max_price = Decimal(10) ** (price_field.max_digits - price_field.decimal_places) - \
+            Decimal(1).scaleb(-price_field.decimal_places)
+        adjusted_price = self._adjusted_price(mode, value)
+        range_error = ValidationError({'price': f'Adjusted prices must be between 0 and {max_price}.'})
+
+        with transaction.atomic():
+            # Rows are locked first, so that concurrent adjustments can't both pass the range check.
+            dishes = self.model.objects.filter(pk__in=list(self.select_for_update(of=('self',)).values_list(
+                'pk', flat=True)))
+            try:
+                # The range is checked on the rounded price before it is cast, casting out of range values fails.
+                overflow = dishes.annotate(adjusted_price=adjusted_price).filter(
+                    Q(adjusted_price__lt=0) | Q(adjusted_price__gt=max_price))
+                if overflow.exists():
+                    raise range_error
+
+                price = Cast(adjusted_price, DecimalField(max_digits=price_field.max_digits,
+                                                          decimal_places=price_field.decimal_places))
+                return dishes.update(price=price, updated_at=timezone.now())
+            except DataError:
+                raise range_error
+
+
 class Dish(BaseModel):
     name = CharField(max_length=255, db_index=True, blank=False)
     description = TextField(blank=False)
@@ -20,6 +71,8 @@ class Dish(BaseModel):
     prep_time = TimeField(verbose_name='preparation time')
     vegetarian = BooleanField(default=False, verbose_name="vege")
 
+    objects = DishQuerySet.as_manager()
+
     class Meta:
         verbose_name_plural = "dishes"
 
@@ -1,6 +1,7 @@
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import ModelSerializer, Serializer, ChoiceField, DecimalField, ListField, \
+    IntegerField, ValidationError
 
-from emenu.models import Dish, DishCard
+from emenu.models import Dish, DishCard, DishQuerySet
 
 
 class DishSerializer(ModelSerializer):
@@ -41,3 +42,17 @@ class DishCardSerializer(ModelSerializer):
 
         instance.save()
         return instance
+
+
+class PriceAdjustmentSerializer(Serializer):
+    mode = ChoiceField(choices=[DishQuerySet.PRICE_PERCENT, DishQuerySet.PRICE_ABSOLUTE])
+    value = DecimalField(max_digits=8, decimal_places=2)
+
+    def validate(self, attrs):
+        if attrs['mode'] == DishQuerySet.PRICE_PERCENT and attrs['value'] < -100:
+            raise ValidationError({'value': 'Percentage decrease cannot exceed 100.'})
+        return attrs
+
+
+class DishPriceAdjustmentSerializer(PriceAdjustmentSerializer):
+    ids = ListField(child=IntegerField(), required=False)
@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from emenu.coalescing import invalidate_coalesced_reads
+from emenu.models import Dish, DishCard
+
+
+# There is no m2m_changed receiver, because any listener on DishCard.dishes.through stops Django from fast deleting
+# its rows, which costs a query on every delete. The admin saves dishes of a card in the transaction of the card save,
+# so its on_commit invalidation comes after them, and DishCardViewSet invalidates after nested writes itself.
+@receiver(post_save, sender=Dish)
+@receiver(post_save, sender=DishCard)
+@receiver(post_delete, sender=Dish)
+@receiver(post_delete, sender=DishCard)
+def invalidate_coalesced_reads_on_change(**kwargs):
+    # Invalidating before the commit would let a concurrent read cache the old rows under the new version.
+    transaction.on_commit(invalidate_coalesced_reads)
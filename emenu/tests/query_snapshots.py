@@ -0,0 +1,76 @@
+import json
+import os
+import re
+from contextlib import contextmanager
+
+import django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), 'query_snapshots.json')
+UPDATE_SNAPSHOTS = os.environ.get('EMENU_UPDATE_QUERY_SNAPSHOTS') == '1'
+
+NORMALIZE_SQL = (
+    (re.compile(r'"s\d+_x\d+"'), '"s?"'),
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\((?:\?, )+\?\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def normalize_sql(sql):
+    """ Replaces literals, IN lists and savepoint names, so that SQL does not depend on test data """
+    for pattern, replacement in NORMALIZE_SQL:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def load_snapshots():
+    try:
+        with open(SNAPSHOT_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+class QuerySnapshotMixin:
+    """
+    Compares queries run inside assertQueriesMatchSnapshot() with query_snapshots.json, which keeps them per database
+    vendor. With the Django version a snapshot was recorded with, the query count and normalized SQL must match it,
+    with other versions the number of queries must not grow.
+    Run tests with EMENU_UPDATE_QUERY_SNAPSHOTS=1 to record snapshots after an intended change.
+    """
+    snapshots = load_snapshots()
+
+    @classmethod
+    def tearDownClass(cls):
+        if UPDATE_SNAPSHOTS:
+            with open(SNAPSHOT_PATH, 'w') as f:
+                json.dump(cls.snapshots, f, indent=2, sort_keys=True)
+                f.write('\n')
+        super().tearDownClass()
+
+    @contextmanager
+    def assertQueriesMatchSnapshot(self, name):
+        with CaptureQueriesContext(connection) as context:
+            yield
+        queries = [normalize_sql(query['sql']) for query in context.captured_queries]
+        django_version = '.'.join(map(str, django.VERSION[:2]))
+
+        if UPDATE_SNAPSHOTS:
+            self.snapshots.setdefault(name, {})[connection.vendor] = {
+                'count': len(queries), 'django': django_version, 'sql': queries}
+            return
+
+        snapshot = self.snapshots.get(name, {}).get(connection.vendor)
+        if snapshot is None:
+            self.fail(f'No {connection.vendor} query snapshot for "{name}", run tests with '
+                      f'EMENU_UPDATE_QUERY_SNAPSHOTS=1 to record it.')
+
+        message = f'Number of queries for "{name}" changed:\n' + '\n'.join(queries)
+        if snapshot['django'] == django_version:
+            self.assertEqual(len(queries), snapshot['count'], message)
+            self.assertEqual(queries, snapshot['sql'], f'SQL for "{name}" changed.')
+        else:
+            self.assertLessEqual(len(queries), snapshot['count'], message)
@@ -0,0 +1,268 @@
+import threading
+import time
+from datetime import time as dish_time
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APITransactionTestCase, APIRequestFactory, APIClient
+
+from ..coalescing import CoalescedReadMixin, SingleFlight, cache_single_flight, invalidate_coalesced_reads, \
+    VERSION_KEY
+from ..models import Dish, DishCard
+from ..serializers import DishCardSerializer
+from ..views import DishViewSet
+
+
+class CountingEvent(threading.Event):
+    def __init__(self):
+        super().__init__()
+        self.waiters = 0
+        self._waiters_lock = threading.Lock()
+
+    def wait(self, timeout=None):
+        with self._waiters_lock:
+            self.waiters += 1
+        return super().wait(timeout)
+
+
+class CountingSingleFlight(SingleFlight):
+    """ SingleFlight which counts callers waiting for the running call, so that tests can wait for them """
+
+    class Call(SingleFlight.Call):
+        def __init__(self):
+            super().__init__()
+            self.done = CountingEvent()
+
+    def wait_for_waiters(self, count):
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            with self._lock:
+                if any(call.done.waiters == count for call in self._calls.values()):
+                    return
+            time.sleep(0.01)
+        raise AssertionError(f'{count} callers did not start waiting for the running call.')
+
+
+class SingleFlightTest(SimpleTestCase):
+    """ Test module for in-process request coalescing """
+
+    def setUp(self):
+        self.single_flight = CountingSingleFlight()
+        self.calls = 0
+        self.release = threading.Event()
+
+    def _slow_call(self):
+        self.calls += 1
+        self.release.wait(10)
+        return self.calls
+
+    def _run_concurrently(self, target, count):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        self.single_flight.wait_for_waiters(count - 1)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+    def test_concurrent_calls_share_result(self):
+        results = []
+        self._run_concurrently(lambda: results.append(self.single_flight.do('key', self._slow_call)), 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [1] * 5)
+
+    def test_sequential_calls_are_not_shared(self):
+        self.release.set()
+        self.assertEqual(self.single_flight.do('key', self._slow_call), 1)
+        self.assertEqual(self.single_flight.do('key', self._slow_call), 2)
+
+    def test_concurrent_calls_share_error(self):
+        def failing_call():
+            self._slow_call()
+            raise KeyError('key')
+
+        errors = []
+
+        def call():
+            try:
+                self.single_flight.do('key', failing_call)
+            except KeyError as e:
+                errors.append(e)
+
+        self._run_concurrently(call, 3)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(errors), 3)
+
+
+class CacheSingleFlightTest(SimpleTestCase):
+    """ Test module for request coalescing across workers """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_result_is_shared_through_cache(self):
+        self.assertEqual(cache_single_flight('key', lambda: 'first'), 'first')
+        self.assertEqual(cache_single_flight('key', lambda: 'second'), 'first')
+
+    def test_expired_lock_of_other_worker_is_kept(self):
+        def slow_call():
+            # The lock expired and was taken by another worker while this one was computing.
+            cache.set('key:lock', 'other')
+            return 'first'
+
+        self.assertEqual(cache_single_flight('key', slow_call), 'first')
+        self.assertEqual(cache.get('key:lock'), 'other')
+
+    def test_waiter_uses_result_of_lock_holder(self):
+        cache.add('key:lock', True)
+        threading.Timer(0.1, lambda: cache.set('key:result', 'shared')).start()
+        self.assertEqual(cache_single_flight('key', lambda: 'own'), 'shared')
+
+    def test_waiter_computes_when_lock_is_released_without_result(self):
+        cache.add('key:lock', True)
+        threading.Timer(0.1, lambda: cache.delete('key:lock')).start()
+        self.assertEqual(cache_single_flight('key', lambda: 'own'), 'own')
+
+    def test_invalidate_bumps_version(self):
+        invalidate_coalesced_reads()
+        invalidate_coalesced_reads()
+        self.assertEqual(cache.get(VERSION_KEY), 2)
+
+
+class CoalescedViewSetTest(APITransactionTestCase):
+    """ Test module for invalidation of coalesced viewset reads, writes have to be committed to invalidate them """
+
+    def setUp(self):
+        cache.clear()
+        self.dish = Dish.objects.create(name='Omlet', description='Cienki placek z jajek.', price=Decimal('15.0'),
+                                        prep_time=dish_time(minute=15), vegetarian=True)
+
+    def _get_dish_name(self):
+        response = self.client.get(f'/dishes/{self.dish.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['name']
+
+    def test_dish_get_after_patch(self):
+        self._get_dish_name()
+        response = self.client.patch(f'/dishes/{self.dish.pk}/', {'name': 'Ziemniak'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._get_dish_name(), 'Ziemniak')
+
+    def test_dish_get_after_orm_save(self):
+        self._get_dish_name()
+        self.dish.name = 'Ziemniak'
+        self.dish.save()
+        self.assertEqual(self._get_dish_name(), 'Ziemniak')
+
+    def test_concurrent_dish_card_gets_share_serialization(self):
+        dish_card = DishCard.objects.create(name='Menu 1', description='Standardowe menu restauracji.')
+        dish_card.dishes.add(self.dish)
+        single_flight = CountingSingleFlight()
+        release = threading.Event()
+        to_representation = DishCardSerializer.to_representation
+        responses = []
+
+        def slow_to_representation(serializer, instance):
+            release.wait(10)
+            return to_representation(serializer, instance)
+
+        def get():
+            try:
+                responses.append(APIClient().get(f'/dish_cards/{dish_card.pk}/'))
+            finally:
+                connection.close()
+
+        with patch.object(CoalescedReadMixin, 'single_flight', single_flight), \
+                patch.object(DishCardSerializer, 'to_representation', autospec=True,
+                             side_effect=slow_to_representation) as serialize:
+            threads = [threading.Thread(target=get) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            single_flight.wait_for_waiters(7)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(serialize.call_count, 1)
+        self.assertEqual([response.status_code for response in responses], [status.HTTP_200_OK] * 8)
+        self.assertEqual({response.data['name'] for response in responses}, {'Menu 1'})
+
+    def _get_dish_card_dishes(self, dish_card):
+        response = self.client.get(f'/dish_cards/{dish_card.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [dish['name'] for dish in response.data['dishes']]
+
+    def test_dish_card_list_after_post_with_dishes(self):
+        def read_during_post(**kwargs):
+            # Caches the new card before its dishes are linked to it.
+            APIClient().get('/dish_cards/')
+
+        post_save.connect(read_during_post, sender=Dish)
+        try:
+            response = self.client.post('/dish_cards/', dict(name='Menu 1', description='Menu dnia.', dishes=[
+                dict(name='Schabowy', description='Kotlet schabowy.', price=Decimal('25.0'), prep_time='00:20')]))
+        finally:
+            post_save.disconnect(read_during_post, sender=Dish)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        dish_cards = self.client.get('/dish_cards/').data
+        self.assertEqual([dish['name'] for dish in dish_cards[0]['dishes']], ['Schabowy'])
+
+    def test_dish_card_get_after_patch_with_dishes(self):
+        dish_card = DishCard.objects.create(name='Menu 1', description='Standardowe menu restauracji.')
+        self.assertEqual(self._get_dish_card_dishes(dish_card), [])
+        response = self.client.patch(f'/dish_cards/{dish_card.pk}/', {'dishes': [
+            dict(name='Schabowy', description='Kotlet schabowy.', price=Decimal('25.0'), prep_time='00:20')]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._get_dish_card_dishes(dish_card), ['Schabowy'])
+
+    def test_dish_card_get_after_admin_change(self):
+        dish_card = DishCard.objects.create(name='Menu 1', description='Standardowe menu restauracji.')
+        self.assertEqual(self._get_dish_card_dishes(dish_card), [])
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        response = self.client.post(f'/admin/emenu/dishcard/{dish_card.pk}/change/', {
+            'name': dish_card.name, 'description': dish_card.description, 'dishes': [self.dish.pk]}, format='multipart')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self._get_dish_card_dishes(dish_card), ['Omlet'])
+
+    def test_dish_get_during_and_after_transaction(self):
+        version = cache.get(VERSION_KEY)
+        with transaction.atomic():
+            self.dish.name = 'Ziemniak'
+            self.dish.save()
+            # Reads made before the commit keep the old version, so they can't outlive the commit.
+            self.assertEqual(cache.get(VERSION_KEY), version)
+            self.assertEqual(self._get_dish_name(), 'Ziemniak')
+        self.assertEqual(cache.get(VERSION_KEY), version + 1)
+        self.assertEqual(self._get_dish_name(), 'Ziemniak')
+
+
+class CoalesceKeyTest(SimpleTestCase):
+    """ Test module for requests which can share a coalesced read """
+
+    def _key(self, user=None, path='/dishes/', **headers):
+        request = Request(APIRequestFactory().get(path, **headers))
+        if user is not None:
+            request.user = user
+        return DishViewSet(basename='dish')._coalesce_key(request)
+
+    def test_same_requests_share_key(self):
+        self.assertEqual(self._key(), self._key())
+        self.assertEqual(self._key(User(pk=1)), self._key(User(pk=1)))
+
+    def test_requests_of_other_clients_do_not_share_key(self):
+        keys = {
+            self._key(),
+            self._key(User(pk=1)),
+            self._key(User(pk=2)),
+            self._key(HTTP_ACCEPT='text/html'),
+            self._key(HTTP_ACCEPT_LANGUAGE='en'),
+            self._key(path='/dishes/?page=2'),
+        }
+        self.assertEqual(len(keys), 6)
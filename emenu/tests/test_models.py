@@ -1,10 +1,13 @@
+import threading
+import time as clock
 from decimal import Decimal
 
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
 from datetime import time
 
-from ..models import Dish, DishCard
+from ..models import Dish, DishCard, DishQuerySet
 
 
 def create_dishes():
@@ -145,3 +148,49 @@ class DishCardTest(TestCase):
     def test_dish_card_description_is_required(self):
         with self.assertRaises(ValidationError):
             DishCard.objects.create(name='Karta dań')
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class DishPriceAdjustmentConcurrencyTest(TransactionTestCase):
+    """ Test module for concurrent price adjustments of the same dishes """
+
+    def setUp(self):
+        self.omlet = create_dishes()[1]
+
+    def _adjust_omlet_price(self):
+        Dish.objects.filter(pk=self.omlet.pk).adjust_prices(DishQuerySet.PRICE_ABSOLUTE, Decimal('-10'))
+
+    def _wait_for_blocked_query(self):
+        deadline = clock.monotonic() + 10
+        with connection.cursor() as cursor:
+            while clock.monotonic() < deadline:
+                # Statistics are read once per transaction unless the snapshot is cleared.
+                cursor.execute('SELECT pg_stat_clear_snapshot()')
+                cursor.execute("SELECT count(*) FROM pg_stat_activity "
+                               "WHERE datname = current_database() AND wait_event_type = 'Lock'")
+                if cursor.fetchone()[0]:
+                    return
+                clock.sleep(0.01)
+        self.fail('Second price adjustment did not wait for the first one.')
+
+    def test_overlapping_adjustments(self):
+        errors = []
+
+        def adjust():
+            try:
+                self._adjust_omlet_price()
+            except ValidationError as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        with transaction.atomic():
+            self._adjust_omlet_price()
+            thread = threading.Thread(target=adjust)
+            thread.start()
+            self._wait_for_blocked_query()
+        thread.join()
+
+        self.assertEqual(len(errors), 1)
+        self.omlet.refresh_from_db()
+        self.assertEqual(self.omlet.price, Decimal('5.00'))
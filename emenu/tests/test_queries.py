@@ -0,0 +1,150 @@
+from datetime import time
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from emenu.models import Dish, DishCard
+from emenu.serializers import DishCardSerializer
+from emenu.tests.query_snapshots import QuerySnapshotMixin
+
+DISH_DICTS = (
+    dict(name='Schabowy', description='Kotlet schabowy z surówką z kapusty kiszonej.', price=Decimal('25.0'),
+         prep_time=time(minute=20)),
+    dict(name='Omlet', description='Cienki placek z jajek.', price=Decimal('15.0'), prep_time=time(minute=15),
+         vegetarian=True),
+    dict(name='Pierogi', description='Pierogi ruskie.', price=Decimal('18.5'), prep_time=time(minute=25),
+         vegetarian=True),
+)
+
+
+def create_dish_cards():
+    dishes = [Dish.objects.create(**dish_dict) for dish_dict in DISH_DICTS]
+    dish_card1 = DishCard.objects.create(name='Menu 1', description='Standardowe menu restauracji.')
+    dish_card1.dishes.add(*dishes)
+    dish_card2 = DishCard.objects.create(name='Menu 2', description='Alternatywne menu restauracji.')
+    dish_card2.dishes.add(dishes[0])
+    return dishes, dish_card1, dish_card2
+
+
+class ViewSetQueryTest(QuerySnapshotMixin, APITestCase):
+    """ Test module for queries run by DishViewSet and DishCardViewSet actions """
+
+    def setUp(self):
+        cache.clear()
+        self.dishes, self.dish_card1, self.dish_card2 = create_dish_cards()
+
+    def _test_snapshot(self, name, http_method, url, status_code, data=None):
+        with self.assertQueriesMatchSnapshot(name):
+            response = getattr(self.client, http_method)(url, data)
+        self.assertEqual(response.status_code, status_code)
+
+    def test_dish_list(self):
+        self._test_snapshot('dish_list', 'get', '/dishes/', status.HTTP_200_OK)
+
+    def test_dish_retrieve(self):
+        self._test_snapshot('dish_retrieve', 'get', f'/dishes/{self.dishes[0].pk}/', status.HTTP_200_OK)
+
+    def test_dish_create(self):
+        self._test_snapshot('dish_create', 'post', '/dishes/', status.HTTP_201_CREATED,
+                            {**DISH_DICTS[0], 'name': 'Bigos'})
+
+    def test_dish_partial_update(self):
+        self._test_snapshot('dish_partial_update', 'patch', f'/dishes/{self.dishes[0].pk}/', status.HTTP_200_OK,
+                            {'name': 'Ziemniak'})
+
+    def test_dish_update(self):
+        self._test_snapshot('dish_update', 'put', f'/dishes/{self.dishes[0].pk}/', status.HTTP_200_OK,
+                            DISH_DICTS[1])
+
+    def test_dish_destroy(self):
+        self._test_snapshot('dish_destroy', 'delete', f'/dishes/{self.dishes[0].pk}/', status.HTTP_204_NO_CONTENT)
+
+    def test_dish_adjust_prices(self):
+        self._test_snapshot('dish_adjust_prices', 'post', '/dishes/adjust_prices/', status.HTTP_200_OK,
+                            dict(mode='percent', value=Decimal('5'), ids=[dish.pk for dish in self.dishes]))
+
+    def test_dish_card_list(self):
+        self._test_snapshot('dish_card_list', 'get', '/dish_cards/', status.HTTP_200_OK)
+
+    def test_dish_card_retrieve(self):
+        self._test_snapshot('dish_card_retrieve', 'get', f'/dish_cards/{self.dish_card1.pk}/', status.HTTP_200_OK)
+
+    def test_dish_card_create(self):
+        self._test_snapshot('dish_card_create', 'post', '/dish_cards/', status.HTTP_201_CREATED,
+                            dict(name='Menu 3', description='Menu dnia.', dishes=[DISH_DICTS[2]]))
+
+    def test_dish_card_partial_update(self):
+        self._test_snapshot('dish_card_partial_update', 'patch', f'/dish_cards/{self.dish_card1.pk}/',
+                            status.HTTP_200_OK, {'description': 'Zmieniony opis.'})
+
+    def test_dish_card_update(self):
+        self._test_snapshot('dish_card_update', 'put', f'/dish_cards/{self.dish_card2.pk}/', status.HTTP_200_OK,
+                            dict(name='Menu 3', description='Menu dnia.', dishes=[DISH_DICTS[2]]))
+
+    def test_dish_card_destroy(self):
+        self._test_snapshot('dish_card_destroy', 'delete', f'/dish_cards/{self.dish_card1.pk}/',
+                            status.HTTP_204_NO_CONTENT)
+
+    def test_dish_card_adjust_prices(self):
+        self._test_snapshot('dish_card_adjust_prices', 'post', f'/dish_cards/{self.dish_card1.pk}/adjust_prices/',
+                            status.HTTP_200_OK, dict(mode='absolute', value=Decimal('-1.5')))
+
+
+class DishCardSerializerQueryTest(QuerySnapshotMixin, TestCase):
+    """ Test module for queries run by DishCardSerializer """
+
+    def setUp(self):
+        self.dishes, self.dish_card1, self.dish_card2 = create_dish_cards()
+
+    def test_dish_card_serializer_create(self):
+        serializer = DishCardSerializer(data=dict(name='Menu 3', description='Menu dnia.',
+                                                  dishes=list(DISH_DICTS[:2])))
+        self.assertTrue(serializer.is_valid())
+        with self.assertQueriesMatchSnapshot('dish_card_serializer_create'):
+            serializer.save()
+
+    def test_dish_card_serializer_update(self):
+        serializer = DishCardSerializer(self.dish_card2, data=dict(name='Menu 3', description='Menu dnia.',
+                                                                   dishes=list(DISH_DICTS[1:])))
+        self.assertTrue(serializer.is_valid())
+        with self.assertQueriesMatchSnapshot('dish_card_serializer_update'):
+            serializer.save()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN plans are checked on PostgreSQL only')
+class QueryPlanTest(TestCase):
+    """ Test module for index usage of name lookups and dish card joins """
+
+    def setUp(self):
+        self.dishes, self.dish_card1, self.dish_card2 = create_dish_cards()
+        # Tables in tests are tiny, so sequential scans are disabled to check that an index can be used at all.
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        self.assertNotIn('Seq Scan', plan, plan)
+        self.assertIn('Index', plan, plan)
+
+    def test_dish_name_lookup(self):
+        self.assertUsesIndex(Dish.objects.filter(name='Omlet'))
+
+    def test_dish_name_prefix_lookup(self):
+        self.assertUsesIndex(Dish.objects.filter(name__startswith='Om'))
+
+    def test_dish_card_name_lookup(self):
+        self.assertUsesIndex(DishCard.objects.filter(name='Menu 1'))
+
+    def test_dish_card_dishes_join(self):
+        self.assertUsesIndex(self.dish_card1.dishes.all())
+
+    def test_dishes_dish_card_join(self):
+        self.assertUsesIndex(DishCard.objects.filter(dishes__name='Omlet'))
+
+    def test_dish_card_adjust_prices_join(self):
+        self.assertUsesIndex(Dish.objects.filter(dishcard=self.dish_card1))
@@ -1,10 +1,14 @@
 import random
 from collections import Counter
 from datetime import time
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
+from unittest.mock import patch
 
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework.throttling import SimpleRateThrottle
 
 from emenu.models import Dish, DishCard
 
@@ -35,6 +39,7 @@ DISH_CARD_VALID_DICTS = (
 
 class BaseTest(APITestCase):
     def setUp(self):
+        cache.clear()
         self.rand_idx = list(range(6))
         random.shuffle(self.rand_idx)
         self.dish1 = Dish.objects.create(**DISH_VALID_DICTS[self.rand_idx[0]])
@@ -64,6 +69,17 @@ class DishRouteTest(BaseTest):
         dish2_pk = Dish.objects.get(name=self.dish2.name).pk
         self._test_get("dishes", dish2_pk, status.HTTP_200_OK)
 
+    @patch.object(SimpleRateThrottle, 'THROTTLE_RATES', {'anon': '2/minute', 'user': '3/minute'})
+    def test_dish_list_throttled_anon(self):
+        statuses = [self.client.get('/dishes/').status_code for _ in range(3)]
+        self.assertEqual(statuses, [status.HTTP_200_OK] * 2 + [status.HTTP_429_TOO_MANY_REQUESTS])
+
+    @patch.object(SimpleRateThrottle, 'THROTTLE_RATES', {'anon': '2/minute', 'user': '3/minute'})
+    def test_dish_list_throttled_user(self):
+        self.client.force_authenticate(User.objects.create_user('kelner'))
+        statuses = [self.client.get('/dishes/').status_code for _ in range(4)]
+        self.assertEqual(statuses, [status.HTTP_200_OK] * 3 + [status.HTTP_429_TOO_MANY_REQUESTS])
+
     def test_dish_get_invalid(self):
         dish1_pk = Dish.objects.get(name=self.dish1.name).pk
         self._test_get("dishes", dish1_pk + 50, status.HTTP_404_NOT_FOUND)
@@ -143,6 +159,40 @@ class DishRouteTest(BaseTest):
         self.assertEqual(response_4.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response_5.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_dish_adjust_prices_valid(self):
+        omlet = Dish.objects.create(**DISH_VALID_DICTS[1])
+        schabowy = Dish.objects.create(**DISH_VALID_DICTS[0])
+        response = self.client.post('/dishes/adjust_prices/',
+                                    dict(mode='percent', value=Decimal('10.5'), ids=[omlet.pk, schabowy.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        omlet.refresh_from_db()
+        schabowy.refresh_from_db()
+        self.assertEqual(omlet.price, Decimal('16.58'))
+        self.assertEqual(schabowy.price, Decimal('27.63'))
+
+        response = self.client.post('/dishes/adjust_prices/',
+                                    dict(mode='absolute', value=Decimal('-5'), ids=[omlet.pk]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        omlet.refresh_from_db()
+        self.assertEqual(omlet.price, Decimal('11.58'))
+
+    def test_dish_adjust_prices_invalid(self):
+        omlet = Dish.objects.create(**DISH_VALID_DICTS[1])
+        expensive = Dish.objects.create(**DISH_VALID_DICTS[4])
+        response_1 = self.client.post('/dishes/adjust_prices/',
+                                      dict(mode='percent', value=Decimal('1'), ids=[omlet.pk, expensive.pk]))
+        response_2 = self.client.post('/dishes/adjust_prices/', dict(mode='absolute', value=Decimal('-16'),
+                                                                     ids=[omlet.pk]))
+        response_3 = self.client.post('/dishes/adjust_prices/', dict(mode='percent', value=Decimal('-101')))
+        response_4 = self.client.post('/dishes/adjust_prices/', dict(mode='double', value=Decimal('2')))
+        self.assertEqual(response_1.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response_2.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response_3.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response_4.status_code, status.HTTP_400_BAD_REQUEST)
+        omlet.refresh_from_db()
+        self.assertEqual(omlet.price, Decimal('15.0'))
+
 
 class DishCardRouteTest(BaseTest):
     def setUp(self):
@@ -214,3 +264,22 @@ class DishCardRouteTest(BaseTest):
         self.assertEqual(response_1.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response_2.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response_3.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_dish_card_adjust_prices_valid(self):
+        prices = {dish.pk: dish.price for dish in self.dish_card1.dishes.all()}
+        response = self.client.post(f'/dish_cards/{self.dish_card1.pk}/adjust_prices/',
+                                    dict(mode='percent', value=Decimal('-10')))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        for dish in self.dish_card1.dishes.all():
+            self.assertEqual(dish.price, (prices[dish.pk] * Decimal('0.9')).quantize(Decimal('0.01'), ROUND_HALF_UP))
+
+    def test_dish_card_adjust_prices_invalid(self):
+        response_1 = self.client.post(f'/dish_cards/{self.dish_card2.pk + 50}/adjust_prices/',
+                                      dict(mode='absolute', value=Decimal('1')))
+        response_2 = self.client.post(f'/dish_cards/{self.dish_card1.pk}/adjust_prices/',
+                                      dict(mode='absolute', value=Decimal('10000')))
+        response_3 = self.client.post(f'/dish_cards/{self.dish_card1.pk}/adjust_prices/', dict(mode='percent'))
+        self.assertEqual(response_1.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response_2.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response_3.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,14 +1,46 @@
+from django.core.exceptions import ValidationError
+from rest_framework import exceptions
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
+from emenu.coalescing import CoalescedReadMixin, invalidate_coalesced_reads
 from emenu.models import Dish, DishCard
-from emenu.serializers import DishSerializer, DishCardSerializer
+from emenu.serializers import DishSerializer, DishCardSerializer, PriceAdjustmentSerializer, \
+    DishPriceAdjustmentSerializer
 
 
-class DishViewSet(ModelViewSet):
+def _adjust_dish_prices(dishes, request, serializer_class):
+    serializer = serializer_class(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+
+    if 'ids' in data:
+        dishes = dishes.filter(pk__in=data['ids'])
+
+    try:
+        updated = dishes.adjust_prices(data['mode'], data['value'])
+    except ValidationError as e:
+        raise exceptions.ValidationError(e.message_dict)
+
+    invalidate_coalesced_reads()
+    return Response({'updated': updated})
+
+
+class DishViewSet(CoalescedReadMixin, ModelViewSet):
     queryset = Dish.objects.all()
     serializer_class = DishSerializer
 
+    @action(detail=False, methods=['post'])
+    def adjust_prices(self, request):
+        return _adjust_dish_prices(self.filter_queryset(self.get_queryset()), request, DishPriceAdjustmentSerializer)
+
 
-class DishCardViewSet(ModelViewSet):
+class DishCardViewSet(CoalescedReadMixin, ModelViewSet):
     queryset = DishCard.objects.all()
     serializer_class = DishCardSerializer
+
+    @action(detail=True, methods=['post'])
+    def adjust_prices(self, request, pk=None):
+        dish_card = self.get_object()
+        return _adjust_dish_prices(Dish.objects.filter(dishcard=dish_card), request, PriceAdjustmentSerializer)